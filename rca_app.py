@@ -2,14 +2,20 @@ import streamlit as st
 from docx import Document
 from docx.shared import Inches, RGBColor
 from PIL import Image, ImageDraw
+import concurrent.futures
 import datetime
-import os
+import functools
 import io
 import gspread
+from gspread.utils import a1_to_rowcol
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
 import pandas as pd
 import json  # Importar json para parsear las credenciales
 
+# Must run before any other Streamlit command, including the spinners of cached resources below.
+st.set_page_config(layout="wide")
+
 # --- CONFIGURATION FOR GOOGLE SHEETS ---
 # Ensure your credentials.json is in the same directory as this script for local testing.
 # For Streamlit Community Cloud, set the GOOGLE_CREDENTIALS secret.
@@ -17,7 +23,11 @@ import json  # Importar json para parsear las credenciales
 scopes = [
     'https://www.googleapis.com/auth/spreadsheets.readonly'
 ]
-try:
+
+
+@st.cache_resource
+def get_sheets_session():
+    """Authorized keep-alive HTTP session shared by every Sheets request in this process."""
     # Attempt to load credentials from st.secrets (for Streamlit Cloud deployment)
     if "GOOGLE_CREDENTIALS" in st.secrets:
         credentials_info = json.loads(st.secrets["GOOGLE_CREDENTIALS"])
@@ -25,7 +35,18 @@ try:
     else:
         # Fallback for local development (credentials.json file)
         credentials = Credentials.from_service_account_file('credentials.json', scopes=scopes)
-    gspread_client = gspread.authorize(credentials)
+    return AuthorizedSession(credentials)
+
+
+@st.cache_resource
+def get_gspread_client():
+    """Builds the gspread client once per process on top of the shared Sheets session."""
+    session = get_sheets_session()
+    return gspread.Client(auth=session.credentials, session=session)
+
+
+try:
+    gspread_client = get_gspread_client()
 except Exception as e:
     st.error(
         f"Error loading Google Sheets credentials: {e}. Make sure credentials.json is present locally or GOOGLE_CREDENTIALS secret is set in Streamlit Cloud.")
@@ -36,239 +57,327 @@ GOOGLE_SHEET_RCA_REPORT_ID = "1-_rjoj_9bXUaa_ZZydEXs6wbUFQ_kjC9rYwAiDc-zXA"
 GOOGLE_SHEET_RCA_REPORT_NAME = "Health Report"
 GOOGLE_SHEET_REPORT_RANGE = "C8:J32"
 
-QUEUE_COL_INDEX_IN_RANGE = 0
-STATUS_COL_INDEX_IN_RANGE = 7
+# The queue name is the first column of the range and the status the last; rows are padded to this width
+_REPORT_RANGE_START, _REPORT_RANGE_END = GOOGLE_SHEET_REPORT_RANGE.split(":")
+REPORT_RANGE_WIDTH = a1_to_rowcol(_REPORT_RANGE_END)[1] - a1_to_rowcol(_REPORT_RANGE_START)[1] + 1
 
 # Volume Data Google Sheet Configuration
 VOLUME_SHEET_ID = "1MUcv83VOBUoEJQhIpsp5HXAtNaaT7-AJQEjlkL1_egs"
 VOLUME_SHEET_NAME = "Sheet1"
-VOLUME_QUEUE_COL_INDEX = 3
-VOLUME_VALUE_COL_INDEX = 2
+VOLUME_SHEET_RANGE = "C:D"
+
+VOLUME_QUEUE_COL_INDEX = 1
+VOLUME_VALUE_COL_INDEX = 0
+
+BLACK = RGBColor(0, 0, 0)
+
+COLORS_RGB = {
+    "red": (255, 0, 0),
+    "amber": (255, 191, 0),
+    "green": (0, 128, 0)
+}
+
+# Health Report status parsing
+_SKIP_NAMES = frozenset({"email queues", "live queues"})
+_VALID_COLORS = frozenset({"red", "amber"})
+# Emoji keys are spelled as named escapes so a non-UTF-8 editor cannot turn them into mojibake.
+# They have no case, so they are matched as-is; only the text fallback is case-folded.
+_STATUS_EXACT = {
+    "\N{LARGE RED CIRCLE}": "red",
+    "\N{LARGE YELLOW CIRCLE}": "amber",
+    "\N{LARGE GREEN CIRCLE}": "green"
+}
+_STATUS_TEXT = {
+    "red": "red",
+    "amber": "amber",
+    "green": "green"
+}
 
 
 # --- HELPER FUNCTIONS ---
 
-def create_colored_circle_image(color_name, output_dir):
-    """Creates a small PNG image of a colored circle."""
-    size = (24, 24)
-    image = Image.new("RGBA", size, (255, 255, 255, 0))
+@functools.lru_cache(maxsize=None)
+def _circle_bytes(color_name):
+    """Renders a small colored-circle PNG in memory, once per color per process."""
+    image = Image.new("RGBA", (24, 24), (255, 255, 255, 0))
     draw = ImageDraw.Draw(image)
 
-    colors_rgb = {
-        "red": (255, 0, 0),
-        "amber": (255, 191, 0),
-        "green": (0, 128, 0)
-    }
+    rgb_color = COLORS_RGB.get(color_name.lower(), (0, 0, 0))
 
-    rgb_color = colors_rgb.get(color_name.lower(), (0, 0, 0))
+    # Radius 11 centred in the 24x24 canvas.
+    draw.ellipse((1, 1, 23, 23), fill=rgb_color)
 
-    radius = min(size) // 2 - 1
-    center = (size[0] // 2, size[1] // 2)
-
-    draw.ellipse((center[0] - radius, center[0] - radius,
-                  center[0] + radius, center[1] + radius),
-                 fill=rgb_color)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    image_path = os.path.join(output_dir, f"{color_name}_circle.png")
-    image.save(image_path)
-    return image_path
+    bio = io.BytesIO()
+    image.save(bio, format="PNG")
+    return bio.getvalue()
 
 
 def map_sheet_color_char_to_name(sheet_status_char):
     """Maps Unicode Health Indicator characters (or text) to color names."""
-    status_map = {
-        "🔴": "red",
-        "🟡": "amber",
-        "🟢": "green",
-        "red": "red",
-        "amber": "amber",
-        "green": "green"
-    }
-    return status_map.get(sheet_status_char.lower().strip(), None)
+    status_char = sheet_status_char.strip()
+    return _STATUS_EXACT.get(status_char) or _STATUS_TEXT.get(status_char.casefold())
 
 
-def get_all_relevant_queues_from_sheet(gspread_client, sheet_id, sheet_name, sheet_range, queue_col_idx_in_range,
-                                       status_col_idx_in_range):
-    """Reads the Google Sheet and filters for 'Red' or 'Amber' queues."""
+def variance_sentence(actual_str, forecast_str, forecast_label, inputs_label):
+    """Describes how far the actual value landed from its forecast, as a report sentence."""
     try:
-        workbook = gspread_client.open_by_key(sheet_id)
-        worksheet = workbook.worksheet(sheet_name)
-        all_data_rows = worksheet.get(sheet_range)
+        actual, forecast = float(actual_str), float(forecast_str)
+    except ValueError:
+        return f"Error: Invalid numeric input for {inputs_label}. Cannot calculate variance."
+    if forecast == 0:
+        return f"Cannot calculate variance: {forecast_label} is zero."
 
-        if not all_data_rows:
-            st.warning(f"Error: The Google Sheet is empty or no data found in range '{sheet_range}'.")
-            return []
+    direction = "higher" if actual > forecast else "lower"
+    return f"Incoming volume was {abs(actual / forecast - 1):.2%} {direction} than forecasted."
 
-        relevant_queues_list = []
 
-        for r_idx, row in enumerate(all_data_rows):
-            if len(row) <= status_col_idx_in_range:
-                continue
+def get_all_relevant_queues_from_rows(all_data_rows):
+    """Filters the Health Report rows for 'Red' or 'Amber' queues."""
+    if not all_data_rows:
+        st.warning(f"Error: The Google Sheet is empty or no data found in range '{GOOGLE_SHEET_REPORT_RANGE}'.")
+        return []
 
-            queue_name = row[queue_col_idx_in_range].strip()
-            status_char = row[status_col_idx_in_range].strip()
+    return [{"Queue Name": queue_name, "Status Color": mapped_color, "Range Index": r_idx}
+            for r_idx, (queue_cell, *_, status_cell) in enumerate(all_data_rows)
+            for queue_name in (queue_cell.strip(),)
+            if queue_name and queue_name.casefold() not in _SKIP_NAMES
+            for mapped_color in (map_sheet_color_char_to_name(status_cell),)
+            if mapped_color in _VALID_COLORS]
 
-            if not queue_name or queue_name.lower() in ["email queues", "live queues"]:
-                continue
 
-            mapped_color = map_sheet_color_char_to_name(status_char)
+@st.cache_resource
+def get_spreadsheet(_client, sheet_id):
+    """Opens a spreadsheet once per process; open_by_key costs a metadata round trip every call."""
+    return _client.open_by_key(sheet_id)
 
-            if mapped_color and mapped_color in ["red", "amber"]:
-                relevant_queues_list.append(
-                    {"Queue Name": queue_name, "Status Color": mapped_color, "Range Index": r_idx})
 
-        return relevant_queues_list
+def _batch_get_values(gspread_client, sheet_id, sheet_name, sheet_range):
+    """Fetches a single A1 range with one spreadsheets.values:batchGet call."""
+    try:
+        response = get_spreadsheet(gspread_client, sheet_id).values_batch_get([f"'{sheet_name}'!{sheet_range}"])
+    except gspread.exceptions.APIError as e:
+        # A range naming a missing worksheet comes back as a 400 "Unable to parse range".
+        if e.code == 400 and "Unable to parse range" in str(e):
+            raise gspread.exceptions.WorksheetNotFound(sheet_name) from e
+        raise
+    return response.get("valueRanges", [{}])[0].get("values", [])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_status_rows(_client, sheet_id, sheet_name, rng):
+    """Cached Health Report rows, keyed by sheet id + range.
+
+    The API trims trailing empty cells, so every row is padded to the full range width.
+    """
+    return [row + [""] * (REPORT_RANGE_WIDTH - len(row))
+            for row in _batch_get_values(_client, sheet_id, sheet_name, rng)]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_volume_map(_client, sheet_id, sheet_name, rng):
+    """Cached lookup of case-folded queue name -> actual volume, keyed by sheet id + range."""
+    vol_rows = _batch_get_values(_client, sheet_id, sheet_name, rng)
+    volume_index = {}
+    for row in vol_rows[1:]:
+        if len(row) > max(VOLUME_QUEUE_COL_INDEX, VOLUME_VALUE_COL_INDEX):
+            # Queue names repeat in the volume sheet; the first matching row wins.
+            volume_index.setdefault(row[VOLUME_QUEUE_COL_INDEX].strip().casefold(),
+                                    row[VOLUME_VALUE_COL_INDEX].strip())
+    return volume_index
+
+
+def fetch_all_sheet_data(gspread_client):
+    """Fetches the Health Report rows and the volume lookup in parallel.
+
+    Returns a tuple ``(status_rows, volume_index)`` where ``volume_index`` maps the
+    case-folded queue name to its actual volume. Each sheet fails independently:
+    ``status_rows`` is None if the Health Report could not be read, and
+    ``volume_index`` is empty if the volume sheet could not be read.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        status_future = executor.submit(_load_status_rows, gspread_client, GOOGLE_SHEET_RCA_REPORT_ID,
+                                        GOOGLE_SHEET_RCA_REPORT_NAME, GOOGLE_SHEET_REPORT_RANGE)
+        volume_future = executor.submit(_load_volume_map, gspread_client, VOLUME_SHEET_ID,
+                                        VOLUME_SHEET_NAME, VOLUME_SHEET_RANGE)
 
+    try:
+        status_rows = status_future.result()
     except gspread.exceptions.SpreadsheetNotFound:
-        st.error(f"Error: Google Sheet with ID '{sheet_id}' not found. Check ID and service account permissions.")
-        return []
+        st.error(f"Error: Google Sheet with ID '{GOOGLE_SHEET_RCA_REPORT_ID}' not found. "
+                 f"Check ID and service account permissions.")
+        status_rows = None
     except gspread.exceptions.WorksheetNotFound:
-        st.error(f"Error: Worksheet with name '{sheet_name}' not found. Check sheet name.")
-        return []
+        st.error(f"Error: Worksheet with name '{GOOGLE_SHEET_RCA_REPORT_NAME}' not found. Check sheet name.")
+        status_rows = None
     except Exception as e:
         st.error(f"An unexpected error occurred while reading Google Sheet: {e}")
-        return []
+        status_rows = None
 
-
-def get_actual_volume_from_sheet(gspread_client, sheet_id, sheet_name, queue_name_to_lookup, queue_col_idx,
-                                 volume_col_idx):
-    """Looks up the actual volume for a given queue name in a specified Google Sheet."""
     try:
-        workbook = gspread_client.open_by_key(sheet_id)
-        worksheet = workbook.worksheet(sheet_name)
-        all_data_rows = worksheet.get_all_values()
+        volume_index = volume_future.result()
+    except gspread.exceptions.SpreadsheetNotFound:
+        st.error(f"Error: Volume Sheet with ID '{VOLUME_SHEET_ID}' not found. "
+                 f"Check ID and service account permissions.")
+        volume_index = {}
+    except gspread.exceptions.WorksheetNotFound:
+        st.error(f"Error: Volume Worksheet with name '{VOLUME_SHEET_NAME}' not found. Check sheet name.")
+        volume_index = {}
+    except Exception as e:
+        st.error(f"An unexpected error occurred while reading volume sheet: {e}")
+        volume_index = {}
+    else:
+        if not volume_index:
+            st.warning(f"Error: Volume sheet '{VOLUME_SHEET_NAME}' is empty or no data found.")
 
-        if not all_data_rows:
-            st.warning(f"Error: Volume sheet '{sheet_name}' is empty or no data found.")
-            return None
+    return status_rows, volume_index
 
-        for row in all_data_rows[1:]:
-            if len(row) > volume_col_idx:
-                sheet_queue_name = row[queue_col_idx].strip()
-                sheet_volume_value = row[volume_col_idx].strip()
 
-                if sheet_queue_name.lower() == queue_name_to_lookup.lower():
-                    st.success(f"Volume found for '{queue_name_to_lookup}': {sheet_volume_value}")
-                    return sheet_volume_value
+def load_sheet_data():
+    """Loads the queue list and volume lookup into session state, skipping queues already processed."""
+    status_rows, st.session_state.volume_index = fetch_all_sheet_data(gspread_client)
+    relevant_queues = get_all_relevant_queues_from_rows(status_rows) if status_rows is not None else []
 
+    processed_queues = {rca['title_skill'] for rca in st.session_state.rca_reports}
+    if 'rca_data' in st.session_state:
+        processed_queues.add(st.session_state.rca_data['title_skill'])
+    st.session_state.remaining_queues = [item for item in relevant_queues
+                                         if item['Queue Name'] not in processed_queues]
+
+
+def get_actual_volume_from_sheet(queue_name_to_lookup):
+    """Looks up the actual volume for a given queue name in the session's volume index."""
+    sheet_volume_value = st.session_state.volume_index.get(queue_name_to_lookup.casefold())
+    if sheet_volume_value is None:
         st.warning(f"Warning: Volume for queue '{queue_name_to_lookup}' not found in volume sheet.")
         return None
 
-    except gspread.exceptions.SpreadsheetNotFound:
-        st.error(f"Error: Volume Sheet with ID '{sheet_id}' not found. Check ID and service account permissions.")
-        return None
-    except gspread.exceptions.WorksheetNotFound:
-        st.error(f"Error: Volume Worksheet with name '{sheet_name}' not found. Check sheet name.")
-        return None
-    except Exception as e:
-        st.error(f"An unexpected error occurred while reading volume sheet: {e}")
-        return None
+    st.success(f"Volume found for '{queue_name_to_lookup}': {sheet_volume_value}")
+    return sheet_volume_value
 
 
 # --- STREAMLIT APP LOGIC ---
 
-st.set_page_config(layout="wide")
 st.title("RCA Report Generator")
 
 # Initialize session state variables
 if 'rca_reports' not in st.session_state:
     st.session_state.rca_reports = []
-if 'document' not in st.session_state:
-    st.session_state.document = Document()
+if 'volume_index' not in st.session_state:
+    st.session_state.volume_index = {}
 if 'remaining_queues' not in st.session_state:
     st.session_state.remaining_queues = None
 if 'current_rca_step' not in st.session_state:
     st.session_state.current_rca_step = "select_queue"
 if 'messages' not in st.session_state:
     st.session_state.messages = []
-if 'driver_text_area_key' not in st.session_state:
-    st.session_state.driver_text_area_key = 0
-if 'temp_dir' not in st.session_state:
-    st.session_state.temp_dir = "temp_report_images"
-    os.makedirs(st.session_state.temp_dir, exist_ok=True)
 
 
-# Function to process an RCA and add to document
-def process_single_rca_to_document(rca_data):
-    doc = st.session_state.document
-    temp_dir = st.session_state.temp_dir
+def _resolve_report_styles(doc):
+    """Looks up the paragraph styles used by the report once per document."""
+    styles = doc.styles
+    return {
+        "bullet": styles['List Bullet'],
+        "heading1": styles['Heading 1'],
+        "heading2": styles['Heading 2']
+    }
 
-    try:
-        if len(st.session_state.rca_reports) > 0:
+
+def _render_rca(doc, rca_data, styles):
+    """Writes a single RCA section (title, Supply, Demand, Drivers) into ``doc``."""
+
+    def bullet_p(text):
+        return doc.add_paragraph(text, style=styles["bullet"])
+
+    def heading2(text):
+        p = doc.add_paragraph(style=styles["heading2"])
+        r = p.add_run(text)
+        r.font.bold = True
+        r.font.color.rgb = BLACK
+        return p
+
+    # Title
+    p_title = doc.add_paragraph(style=styles["heading1"])
+    run_img = p_title.add_run()
+    run_img.add_picture(io.BytesIO(_circle_bytes(rca_data['report_color'])),
+                        width=Inches(0.18), height=Inches(0.18))
+    run_text_title = p_title.add_run(f" {rca_data['title_skill'].upper()}")
+    run_text_title.font.bold = True
+    run_text_title.font.color.rgb = BLACK
+
+    # Supply Section
+    heading2("Supply")
+    for line_text in rca_data['supply_word_lines']:
+        bullet_p(line_text)
+
+    # Demand Section
+    heading2("Demand")
+    bullet_p(f"Forecast volume was {rca_data['forecasted_volume_str']}.")
+    bullet_p(f"Actual volume was {rca_data['actual_volume_str']}.")
+    bullet_p(rca_data['variance_text'])
+
+    # Main Drivers & Mitigation actions Section
+    heading2("Main Drivers & Mitigation actions")
+    for driver_item in rca_data['drivers_list']:
+        bullet_p(driver_item)
+
+
+def build_report_document(rca_reports):
+    """Builds the final Word document from the collected RCA data."""
+    doc = Document()
+    styles = _resolve_report_styles(doc)
+    for i, rca_data in enumerate(rca_reports):
+        if i > 0:
             doc.add_paragraph()
             doc.add_paragraph()
+        _render_rca(doc, rca_data, styles)
+    return doc
 
-            # Add Content to Word Document
-        circle_image_path = create_colored_circle_image(rca_data['report_color'], temp_dir)
-
-        # Title
-        p_title = doc.add_paragraph()
-        run_img = p_title.add_run()
-        run_img.add_picture(circle_image_path, width=Inches(0.18), height=Inches(0.18))
-        run_text_title = p_title.add_run(f" {rca_data['title_skill'].upper()}")
-        run_text_title.font.bold = True
-        run_text_title.font.color.rgb = RGBColor(0, 0, 0)
-        p_title.style = 'Heading 1'
-
-        # Supply Section
-        p_supply_subtitle = doc.add_paragraph()
-        run_text_supply_subtitle = p_supply_subtitle.add_run("Supply")
-        run_text_supply_subtitle.font.bold = True
-        run_text_supply_subtitle.font.color.rgb = RGBColor(0, 0, 0)
-        p_supply_subtitle.style = 'Heading 2'
-        for line_text in rca_data['supply_word_lines']:
-            p = doc.add_paragraph(line_text)
-            p.style = 'List Bullet'
-
-        # Demand Section
-        p_demand_subtitle = doc.add_paragraph()
-        run_text_demand_subtitle = p_demand_subtitle.add_run("Demand")
-        run_text_demand_subtitle.font.bold = True
-        run_text_demand_subtitle.font.color.rgb = RGBColor(0, 0, 0)
-        p_demand_subtitle.style = 'Heading 2'
-        doc.add_paragraph(f"Forecast volume was {rca_data['forecasted_volume_str']}.").style = 'List Bullet'
-        doc.add_paragraph(f"Actual volume was {rca_data['actual_volume_str']}.").style = 'List Bullet'
-        doc.add_paragraph(rca_data['variance_text']).style = 'List Bullet'
-
-        # Main Drivers & Mitigation actions Section
-        p_drivers_subtitle = doc.add_paragraph()
-        run_text_drivers_subtitle = p_drivers_subtitle.add_run("Main Drivers & Mitigation actions")
-        run_text_drivers_subtitle.font.bold = True
-        run_text_drivers_subtitle.font.color.rgb = RGBColor(0, 0, 0)
-        p_drivers_subtitle.style = 'Heading 2'
-        for driver_item in rca_data['drivers_list']:
-            p_driver = doc.add_paragraph(driver_item)
-            p_driver.style = 'List Bullet'
-
-        st.session_state.rca_reports.append(rca_data)
-        st.session_state.messages.append(f"RCA for '{rca_data['title_skill']}' added to document.")
 
-    except Exception as e:
-        st.error(f"Error adding RCA to document: {e}")
-    finally:
-        if circle_image_path and os.path.exists(circle_image_path):
-            os.remove(circle_image_path)
-            try:
-                os.rmdir(temp_dir)
-            except OSError:
-                pass
+def render_report_bytes(rca_reports):
+    """Builds the report document and returns the serialized .docx bytes."""
+    bio = io.BytesIO()
+    build_report_document(rca_reports).save(bio)
+    return bio.getvalue()
+
+
+# Function to record a completed RCA; the document itself is only built on finalize
+def process_single_rca_to_document(rca_data):
+    st.session_state.rca_reports.append(rca_data)
+    st.session_state.messages.append(f"RCA for '{rca_data['title_skill']}' added to document.")
+
+
+# Driver collection reruns on its own, without re-executing the rest of the RCA form
+@st.fragment
+def drivers_ui():
+    st.write("What were the main drivers and/or mitigation actions?")
+    with st.form("driver_form", clear_on_submit=True):
+        driver_input = st.text_area("Type an action/driver and click 'Add Action'", key="driver_text_area")
+        if st.form_submit_button("Add Action") and driver_input.strip():
+            st.session_state.rca_data['drivers_list'].append(driver_input.strip())
+            st.session_state.messages.append(f"Added driver: {driver_input.strip()}")
+            # The sidebar only refreshes on a full rerun, so confirm inside the fragment as well.
+            st.toast(f"Added driver: {driver_input.strip()}")
+
+    if st.session_state.rca_data['drivers_list']:
+        st.write("--- Current Drivers/Actions ---")
+        for i, driver in enumerate(st.session_state.rca_data['drivers_list']):
+            st.write(f"- {driver}")
+    else:
+        st.info("No drivers/actions added yet.")
 
 
 # --- Streamlit UI Flow ---
 
+if st.sidebar.button("Refresh sheets", key="refresh_sheets_button"):
+    _load_status_rows.clear()
+    _load_volume_map.clear()
+    load_sheet_data()
+    st.session_state.messages.append("Google Sheets data refreshed.")
+
 if st.session_state.current_rca_step == "select_queue":
     st.header("Step 1: Select Queue for RCA")
     if st.session_state.remaining_queues is None:
-        st.session_state.remaining_queues = get_all_relevant_queues_from_sheet(
-            gspread_client,
-            GOOGLE_SHEET_RCA_REPORT_ID,
-            GOOGLE_SHEET_RCA_REPORT_NAME,
-            GOOGLE_SHEET_REPORT_RANGE,
-            QUEUE_COL_INDEX_IN_RANGE,
-            STATUS_COL_INDEX_IN_RANGE
-        )
+        load_sheet_data()
 
     # Debugging output - remove after confirming fix
     # st.write("--- Debugging get_all_relevant_queues_from_sheet ---")
@@ -360,24 +469,9 @@ elif st.session_state.current_rca_step == "collect_inputs":
                                                          key="req_live_hours")
         actual_live_channel_hours_str = st.text_input("How many actual hours were?", key="actual_live_hours")
 
-        result_text = ""
         if required_hours_live_channels_str and actual_live_channel_hours_str:
-            try:
-                required_hours_live_channels = float(required_hours_live_channels_str)
-                actual_live_channel_hours = float(actual_live_channel_hours_str)
-
-                if required_hours_live_channels == 0:
-                    result_text = "Cannot calculate variance: Required hours to handle forecasted volume is zero."
-                else:
-                    result_value = (actual_live_channel_hours / required_hours_live_channels) - 1
-                    result_formatted = f"{abs(result_value):.2%}"
-
-                    if actual_live_channel_hours > required_hours_live_channels:
-                        result_text = f"Incoming volume was {result_formatted} higher than forecasted."
-                    else:
-                        result_text = f"Incoming volume was {result_formatted} lower than forecasted."
-            except ValueError:
-                result_text = "Error: Invalid numeric input. Cannot calculate variance."
+            result_text = variance_sentence(actual_live_channel_hours_str, required_hours_live_channels_str,
+                                            "Required hours to handle forecasted volume", "required or actual hours")
 
             supply_word_lines.append(
                 f"Required hours to handle forecasted volume were {required_hours_live_channels_str}.")
@@ -391,14 +485,7 @@ elif st.session_state.current_rca_step == "collect_inputs":
     st.subheader("Demand Section")
     forecasted_volume_str = st.text_input("What is the forecasted volume?", key="forecasted_volume")
 
-    actual_volume_str_auto = get_actual_volume_from_sheet(
-        gspread_client,
-        VOLUME_SHEET_ID,
-        VOLUME_SHEET_NAME,
-        st.session_state.rca_data['title_skill'],
-        VOLUME_QUEUE_COL_INDEX,
-        VOLUME_VALUE_COL_INDEX
-    )
+    actual_volume_str_auto = get_actual_volume_from_sheet(st.session_state.rca_data['title_skill'])
     actual_volume_str_manual = st.text_input(
         f"Actual volume (auto-fetched for '{st.session_state.rca_data['title_skill']}'):",
         value=actual_volume_str_auto if actual_volume_str_auto is not None else "",
@@ -406,25 +493,9 @@ elif st.session_state.current_rca_step == "collect_inputs":
     )
     actual_volume_str = actual_volume_str_manual
 
-    variance_text = ""
     if forecasted_volume_str and actual_volume_str:
-        try:
-            forecasted_volume = float(forecasted_volume_str)
-            actual_volume = float(actual_volume_str)
-
-            if forecasted_volume == 0:
-                variance_text = "Cannot calculate variance: Forecasted volume is zero."
-            else:
-                variance_value = (actual_volume / forecasted_volume) - 1
-                variance_formatted = f"{abs(variance_value):.2%}"
-
-                if actual_volume > forecasted_volume:
-                    variance_text = f"Incoming volume was {variance_formatted} higher than forecasted."
-                else:
-                    variance_text = f"Incoming volume was {variance_formatted} lower than forecasted."
-        except ValueError:
-            variance_text = "Error: Invalid numeric input for forecasted or actual volume. Cannot calculate variance."
-        st.session_state.rca_data['variance_text'] = variance_text
+        st.session_state.rca_data['variance_text'] = variance_sentence(
+            actual_volume_str, forecasted_volume_str, "Forecasted volume", "forecasted or actual volume")
     else:
         st.session_state.rca_data['variance_text'] = ""
         st.warning("Please fill all Demand fields.")
@@ -434,23 +505,7 @@ elif st.session_state.current_rca_step == "collect_inputs":
     if 'drivers_list' not in st.session_state.rca_data:
         st.session_state.rca_data['drivers_list'] = []
 
-    st.write("What were the main drivers and/or mitigation actions?")
-    driver_input = st.text_area("Type an action/driver and click 'Add Action'",
-                                key=f"driver_text_area_{st.session_state.driver_text_area_key}")
-
-    if st.button("Add Action", key="add_driver_button"):
-        if driver_input.strip():
-            st.session_state.rca_data['drivers_list'].append(driver_input.strip())
-            st.session_state.messages.append(f"Added driver: {driver_input.strip()}")
-            st.session_state.driver_text_area_key += 1
-            st.rerun()
-
-    if st.session_state.rca_data['drivers_list']:
-        st.write("--- Current Drivers/Actions ---")
-        for i, driver in enumerate(st.session_state.rca_data['drivers_list']):
-            st.write(f"- {driver}")
-    else:
-        st.info("No drivers/actions added yet.")
+    drivers_ui()
 
     st.session_state.rca_data['forecasted_volume_str'] = forecasted_volume_str
     st.session_state.rca_data['actual_volume_str'] = actual_volume_str
@@ -493,17 +548,19 @@ elif st.session_state.current_rca_step == "finish":
 
     if len(st.session_state.rca_reports) > 0:
         output_filename = f"RCA_Multi_Report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        bio = io.BytesIO()
-        st.session_state.document.save(bio)
-        bio.seek(0)
-        st.download_button(
-            label="Download Final Report",
-            data=bio,
-            file_name=output_filename,
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            key="download_finished_report"
-        )
-        st.success("Your report is ready for download!")
+        try:
+            report_bytes = render_report_bytes(st.session_state.rca_reports)
+        except Exception as e:
+            st.error(f"Error building report document: {e}")
+        else:
+            st.download_button(
+                label="Download Final Report",
+                data=report_bytes,
+                file_name=output_filename,
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                key="download_finished_report"
+            )
+            st.success("Your report is ready for download!")
     else:
         st.warning("No RCAs were processed. No report to download.")
 